@@ -1,13 +1,39 @@
 #!/usr/bin/env python3
 import argparse
-import json
+import concurrent.futures
+import copy
+import datetime as dt
+import functools
+import io
+import multiprocessing
 import os
 import re
 import sys
-from typing import List, Union, Dict, Any
+from typing import List, Union, Dict, Any, Optional, Pattern, Iterable, Iterator, Callable, IO
+
+# --- JSON parsing ---
+import orjson
 
 # --- DOCX imports ---
+import docx.document
 from docx import Document
+from docx.comments import Comment
+from docx.oxml.ns import nsmap, qn
+from docx.text.paragraph import Paragraph
+from lxml import etree
+
+# --- Multi-pattern search ---
+import ahocorasick
+
+try:
+    import hyperscan  # optional; not available on every platform
+except ImportError:
+    hyperscan = None
+
+try:
+    import re2  # optional (google-re2); linear-time matching for regex targets
+except ImportError:
+    re2 = None
 
 # --- PDF imports ---
 import fitz  # PyMuPDF
@@ -15,42 +41,194 @@ import fitz  # PyMuPDF
 # --- OpenAI import ---
 from openai import OpenAI
 
-def extract_text(file_path: str) -> str:
-    """Extracts text content from .docx, .pdf, or text files."""
+try:
+    import tiktoken  # optional; exact token counts for the KB size check
+except ImportError:
+    tiktoken = None
+
+GRADING_MODEL = "gpt-4o"
+# Bump whenever the grading prompt changes, so cached annotations are not reused
+PROMPT_VERSION = "v1"
+
+# General KBs longer than this are condensed by a cheaper model before grading
+KB_SUMMARY_MODEL = "gpt-4o-mini"
+KB_SUMMARY_MIN_TOKENS = 4000
+
+# (abs path, mtime) -> summary, so a KB reused across papers is condensed once
+_kb_summaries: Dict[tuple, str] = {}
+
+# One client per API key, kept across runs so its connection pool is reused
+_openai_clients: Dict[Optional[str], OpenAI] = {}
+
+def extract_text(file_path: str, max_chars: Optional[int] = None) -> str:
+    """
+    Extracts text content from .docx, .pdf, or text files.
+    If max_chars is given, extraction stops once that many characters are read.
+
+    Results are memoized per (absolute path, mtime), so a file passed more
+    than once (e.g. the same document as paper and rubric) is parsed once.
+    """
     if not file_path or not os.path.exists(file_path):
         return ""
-    
-    ext = os.path.splitext(file_path)[1].lower()
-    
+
+    abs_path = os.path.abspath(file_path)
     try:
-        if ext == ".docx":
-            doc = Document(file_path)
-            return "\n".join([p.text for p in doc.paragraphs])
-        elif ext == ".pdf":
-            doc = fitz.open(file_path)
-            text = ""
-            for page in doc:
-                text += page.get_text()
-            return text
-        else:
-            # Assume text file
-            with open(file_path, "r", encoding="utf-8", errors="ignore") as f:
-                return f.read()
+        return _extract_text_cached(abs_path, os.path.getmtime(abs_path), max_chars)
     except Exception as e:
+        # Failures raise through the cache, so a retry re-reads the file
         print(f"Error extracting text from {file_path}: {e}")
         return ""
 
-def generate_annotations(doc_path: str, rubric_path: str, assign_kb_path: str, general_kb_path: str) -> List[Dict[str, Any]]:
+
+@functools.lru_cache(maxsize=32)
+def _extract_text_cached(abs_path: str, mtime: float, max_chars: Optional[int]) -> str:
+    # mtime is only part of the cache key: an edited file gets re-extracted
+    return _extract_text_uncached(abs_path, max_chars)
+
+
+def extract_text_from_bytes(file_path: str, data: bytes, max_chars: Optional[int] = None) -> str:
     """
-    Generates annotations using OpenAI API based on the input document and auxiliary files.
+    Like extract_text, for a file whose contents the caller has already read.
+    file_path is only used for its extension and in error messages.
     """
-    client = OpenAI(api_key=os.environ.get("OPENAI_API_KEY"))
+    if not data:
+        return ""
+    try:
+        return _extract_text_uncached(file_path, max_chars, data)
+    except Exception as e:
+        print(f"Error extracting text from {file_path}: {e}")
+        return ""
+
+
+def _extract_text_uncached(
+    file_path: str, max_chars: Optional[int] = None, data: Optional[bytes] = None
+) -> str:
+    ext = os.path.splitext(file_path)[1].lower()
+
+    if ext == ".docx":
+        text = extract_text_from_docx_obj(Document(file_path if data is None else io.BytesIO(data)))
+    elif ext == ".pdf":
+        parts = []
+        total = 0
+        # Opening by path lets MuPDF read pages on demand; closing right
+        # away frees its page cache before the next input is extracted.
+        pdf = fitz.open(file_path) if data is None else fitz.open(stream=data, filetype="pdf")
+        with pdf as doc:
+            for page in doc:
+                page_text = page.get_text()
+                parts.append(page_text)
+                total += len(page_text)
+                # Don't make MuPDF walk the remaining pages once we have enough
+                if max_chars is not None and total >= max_chars:
+                    break
+        text = "".join(parts)
+    else:
+        # Assume text file
+        if data is not None:
+            text = data.decode("utf-8", errors="ignore")
+        else:
+            with open(file_path, "r", encoding="utf-8", errors="ignore") as f:
+                text = f.read() if max_chars is None else f.read(max_chars)
+
+    if max_chars is not None:
+        return text[:max_chars]
+    return text
+
+def extract_text_from_docx_obj(doc: Document) -> str:
+    """Extracts text content from an already opened python-docx Document."""
+    return "\n".join(p.text for p in doc.paragraphs)
+
+
+@functools.lru_cache(maxsize=None)
+def _token_encoding():
+    return tiktoken.encoding_for_model(GRADING_MODEL)
+
+
+def count_tokens(text: str) -> int:
+    """Token count for the grading model; a ~4 chars/token estimate without tiktoken."""
+    if tiktoken is None:
+        return len(text) // 4
+    return len(_token_encoding().encode(text))
+
+
+def summarize_general_kb(client: OpenAI, kb_path: str, kb_text: str) -> str:
+    """
+    Condense a large general knowledge base with KB_SUMMARY_MODEL.
+    Small KBs are returned unchanged; summaries are cached by file mtime.
+    """
+    if count_tokens(kb_text) <= KB_SUMMARY_MIN_TOKENS:
+        return kb_text
+
+    key = (os.path.abspath(kb_path), os.path.getmtime(kb_path))
+    if key not in _kb_summaries:
+        completion = client.chat.completions.create(
+            model=KB_SUMMARY_MODEL,
+            messages=[
+                {
+                    "role": "system",
+                    "content": "Condense the following reference material for a grader. "
+                    "Keep every fact, rule, definition and requirement a paper could be checked against; "
+                    "drop examples, repetition and boilerplate.",
+                },
+                {"role": "user", "content": kb_text},
+            ],
+        )
+        _kb_summaries[key] = completion.choices[0].message.content or kb_text
+
+    return _kb_summaries[key]
+
+
+def get_openai_client(api_key: Optional[str] = None) -> OpenAI:
+    """Shared OpenAI client for api_key (OPENAI_API_KEY from the environment if None)."""
+    if api_key not in _openai_clients:
+        # A key change replaces the old client rather than accumulating them
+        _openai_clients.clear()
+        _openai_clients[api_key] = OpenAI(
+            api_key=api_key if api_key is not None else os.environ.get("OPENAI_API_KEY")
+        )
+    return _openai_clients[api_key]
+
+
+def _side_text(path: str, data: Optional[bytes], prebuilt: Optional[str]) -> str:
+    # Cheapest source first: text the caller already extracted, then bytes it read
+    if prebuilt is not None:
+        return prebuilt
+    if data is not None:
+        return extract_text_from_bytes(path, data)
+    return extract_text(path)
+
+
+def _grading_request(
+    doc_path: str,
+    rubric_path: str,
+    assign_kb_path: str,
+    general_kb_path: str,
+    doc_text: Optional[str] = None,
+    side_data: Optional[tuple] = None,
+    api_key: Optional[str] = None,
+    client: Optional[OpenAI] = None,
+    prebuilt_rubric: Optional[str] = None,
+    prebuilt_assign_kb: Optional[str] = None,
+    prebuilt_general_kb: Optional[str] = None,
+) -> tuple:
+    """Pick the OpenAI client and build the grading chat messages for the given inputs."""
+    if client is None:
+        client = get_openai_client(api_key)
 
     # Extract text from all documents
-    doc_text = extract_text(doc_path)
-    rubric_text = extract_text(rubric_path)
-    assign_kb_text = extract_text(assign_kb_path)
-    general_kb_text = extract_text(general_kb_path)
+    if doc_text is None:
+        doc_text = extract_text(doc_path)
+    rubric_data, assign_kb_data, general_kb_data = side_data or (None, None, None)
+    rubric_text = _side_text(rubric_path, rubric_data, prebuilt_rubric)
+    assign_kb_text = _side_text(assign_kb_path, assign_kb_data, prebuilt_assign_kb)
+    general_kb_text = _side_text(general_kb_path, general_kb_data, prebuilt_general_kb)
+
+    # The student paper is always sent in full: targets must match it exactly.
+    # Condensing is only an optimization, so a failure sends the KB as is.
+    try:
+        general_kb_text = summarize_general_kb(client, general_kb_path, general_kb_text)
+    except Exception as e:
+        print(f"Could not condense the general KB, sending it in full: {e}")
 
     system_prompt = """
     You are a helpful teaching assistant. Your goal is to grade a paper and provide feedback.
@@ -90,40 +268,189 @@ def generate_annotations(doc_path: str, rubric_path: str, assign_kb_path: str, g
     Grade this paper based on the provided context.
     """
 
+    messages = [
+        {"role": "system", "content": system_prompt},
+        {"role": "user", "content": user_content}
+    ]
+    return client, messages
+
+
+def _normalize_annotations(data: Any) -> List[Dict[str, Any]]:
+    # The model might return { "annotations": [...] } or just [...]
+    if isinstance(data, list):
+        return data
+    elif isinstance(data, dict):
+        # Check if it's wrapped in a key like 'annotations'
+        for key in data:
+            if isinstance(data[key], list):
+                return data[key]
+        # If it's a single annotation object
+        return [data]
+    else:
+        return []
+
+
+def generate_annotations(
+    doc_path: str,
+    rubric_path: str,
+    assign_kb_path: str,
+    general_kb_path: str,
+    doc_text: Optional[str] = None,
+    side_data: Optional[tuple] = None,
+    api_key: Optional[str] = None,
+    client: Optional[OpenAI] = None,
+    prebuilt_rubric: Optional[str] = None,
+    prebuilt_assign_kb: Optional[str] = None,
+    prebuilt_general_kb: Optional[str] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Generates annotations using OpenAI API based on the input document and auxiliary files.
+    Pass doc_text when the caller already has the document's text, and side_data
+    as (rubric, assign_kb, general_kb) bytes when it has already read those files,
+    to avoid re-reading them. The prebuilt_* texts, when given, are used as
+    is and skip extraction altogether. The request goes through client if given, else
+    through a shared client for api_key (or OPENAI_API_KEY).
+    """
+    client, messages = _grading_request(
+        doc_path, rubric_path, assign_kb_path, general_kb_path, doc_text, side_data,
+        api_key=api_key, client=client, prebuilt_rubric=prebuilt_rubric,
+        prebuilt_assign_kb=prebuilt_assign_kb, prebuilt_general_kb=prebuilt_general_kb
+    )
+
     try:
         completion = client.chat.completions.create(
-            model="gpt-4o",
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_content}
-            ],
+            model=GRADING_MODEL,
+            messages=messages,
             response_format={"type": "json_object"}
         )
         
         content = completion.choices[0].message.content
         
         # Parse the JSON response
-        # The model might return { "annotations": [...] } or just [...]
-        data = json.loads(content)
-        
-        if isinstance(data, list):
-            return data
-        elif isinstance(data, dict):
-            # Check if it's wrapped in a key like 'annotations'
-            for key in data:
-                if isinstance(data[key], list):
-                    return data[key]
-            # If it's a single annotation object
-            return [data]
-        else:
-            return []
+        return _normalize_annotations(orjson.loads(content))
+
+    except Exception as e:
+        raise RuntimeError(f"OpenAI API Error: {e}")
+
+
+def generate_annotations_stream(
+    doc_path: str,
+    rubric_path: str,
+    assign_kb_path: str,
+    general_kb_path: str,
+    doc_text: Optional[str] = None,
+    side_data: Optional[tuple] = None,
+    api_key: Optional[str] = None,
+    client: Optional[OpenAI] = None,
+    prebuilt_rubric: Optional[str] = None,
+    prebuilt_assign_kb: Optional[str] = None,
+    prebuilt_general_kb: Optional[str] = None,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Like generate_annotations, but streams the completion and yields each
+    annotation as soon as it has been fully received, so callers can start
+    applying comments while the model is still writing the rest.
+    """
+    client, messages = _grading_request(
+        doc_path, rubric_path, assign_kb_path, general_kb_path, doc_text, side_data,
+        api_key=api_key, client=client, prebuilt_rubric=prebuilt_rubric,
+        prebuilt_assign_kb=prebuilt_assign_kb, prebuilt_general_kb=prebuilt_general_kb
+    )
+
+    try:
+        stream = client.chat.completions.create(
+            model=GRADING_MODEL,
+            messages=messages,
+            response_format={"type": "json_object"},
+            stream=True
+        )
+        yield from iter_streamed_annotations(_completion_text_chunks(stream))
 
     except Exception as e:
         raise RuntimeError(f"OpenAI API Error: {e}")
 
+
+def _completion_text_chunks(stream) -> Iterator[str]:
+    """The content pieces of a streamed completion, failing if it was cut off."""
+    for chunk in stream:
+        if not chunk.choices:
+            continue
+        choice = chunk.choices[0]
+        if choice.delta.content:
+            yield choice.delta.content
+        if choice.finish_reason == "length":
+            raise ValueError("Annotation response was cut off at the token limit")
+
+
+def iter_streamed_annotations(text_chunks: Iterable[str]) -> Iterator[Dict[str, Any]]:
+    """
+    Yield annotation objects from a JSON document arriving in pieces.
+
+    The annotations are the objects in the top-level list, or in the first
+    list directly inside the top-level object (e.g. {"annotations": [...]}),
+    matching _normalize_annotations. Each is parsed and yielded as soon as its
+    closing brace arrives. A response without such a list (a single bare
+    annotation) is parsed once the stream ends. Raises ValueError if the
+    stream ends before the JSON is complete.
+    """
+    raw: List[str] = []      # every chunk, for the end-of-stream fallback
+    stack: List[str] = []    # open "{" / "[" containers
+    in_string = False
+    escaped = False
+    list_depth = None        # len(stack) directly inside the annotations list
+    list_closed = False
+    item: Optional[List[str]] = None  # pieces of the object being read
+
+    for chunk in text_chunks:
+        raw.append(chunk)
+        item_start = 0 if item is not None else None
+
+        for i, ch in enumerate(chunk):
+            if in_string:
+                if escaped:
+                    escaped = False
+                elif ch == "\\":
+                    escaped = True
+                elif ch == '"':
+                    in_string = False
+                continue
+
+            if ch == '"':
+                in_string = True
+            elif ch == "{" or ch == "[":
+                if ch == "[" and list_depth is None and (not stack or stack == ["{"]):
+                    list_depth = len(stack) + 1
+                elif ch == "{" and not list_closed and len(stack) == list_depth:
+                    item = []
+                    item_start = i
+                stack.append(ch)
+            elif ch == "}" or ch == "]":
+                if stack:
+                    stack.pop()
+                if ch == "}" and item is not None and len(stack) == list_depth:
+                    item.append(chunk[item_start:i + 1])
+                    yield orjson.loads("".join(item))
+                    item = None
+                    item_start = None
+                elif ch == "]" and list_depth is not None and len(stack) == list_depth - 1:
+                    list_closed = True
+
+        if item is not None:
+            item.append(chunk[item_start:])
+
+    if stack or in_string or (list_depth is not None and not list_closed):
+        # e.g. the model stopped at its token limit; the annotations already
+        # yielded are only part of the result
+        raise ValueError("Annotation response ended before its JSON was complete")
+
+    if list_depth is None:
+        yield from _normalize_annotations(orjson.loads("".join(raw)))
+
+
 def load_annotations(json_path: str) -> List[Dict[str, Any]]:
-    with open(json_path, "r", encoding="utf-8") as f:
-        data = json.load(f)
+    # orjson parses the raw bytes directly, skipping the text decode step
+    with open(json_path, "rb") as f:
+        data = orjson.loads(f.read())
 
     if isinstance(data, dict):
         return [data]
@@ -132,6 +459,21 @@ def load_annotations(json_path: str) -> List[Dict[str, Any]]:
     raise ValueError("JSON must be an object or a list of objects.")
 
 
+def occurrence_number(occurrence: Any) -> Optional[int]:
+    """
+    The 1-based match an annotation wants, or None for "all".
+    occurrence can be "first", "all" or a specific integer.
+    """
+    if occurrence == "all":
+        return None
+    if occurrence == "first":
+        return 1
+    try:
+        return int(occurrence)
+    except Exception:
+        return 1
+
+
 # ==========================================================
 # DOCX COMMENTING
 # ==========================================================
@@ -140,12 +482,167 @@ def add_comment_to_paragraph(doc: Document, paragraph, comment_text: str, author
     """
     Attach a Word comment to an entire paragraph.
     """
-    # Use the native add_comment method available in python-docx >= 1.2.0
-    # It handles creating the comments part if needed.
-    if not paragraph.runs:
+    add_comments_to_paragraphs(doc, [(paragraph, comment_text, author)])
+
+
+def add_comments_to_paragraphs(doc: Document, pending: List[tuple]):
+    """
+    Attach a batch of (paragraph, comment_text, author) comments in one pass.
+    doc.add_comment re-resolves the comments part and rescans every existing
+    comment id on each call; here both happen once for the whole batch.
+    """
+    pending = [(runs, text, author) for p, text, author in pending for runs in (p.runs,) if runs]
+    if not pending:
         return
 
-    doc.add_comment(paragraph.runs, comment_text, author=author)
+    comments = doc.comments
+    comments_elm = getattr(comments, "_comments_elm", None)
+    if comments_elm is None or not hasattr(comments, "_comments_part"):
+        # The batch path relies on python-docx internals; without them fall
+        # back to the public API, one comment at a time
+        for runs, comment_text, author in pending:
+            doc.add_comment(runs, comment_text, author=author)
+        return
+
+    # A minimal valid w:comment carrying the next free id, cloned per comment
+    template = comments_elm.add_comment()
+    comments_elm.remove(template)
+    next_id = template.id
+    created = dt.datetime.now(dt.timezone.utc)
+
+    for runs, comment_text, author in pending:
+        comment_elm = copy.deepcopy(template)
+        comment_elm.id = next_id
+        comment_elm.author = author
+        comment_elm.initials = ""
+        comment_elm.date = created
+        comments_elm.append(comment_elm)
+
+        # Same text handling as Comments.add_comment: one paragraph per line
+        if comment_text:
+            comment = Comment(comment_elm, comments._comments_part)
+            first_line, *other_lines = comment_text.split("\n")
+            comment.paragraphs[0].add_run(first_line)
+            for line in other_lines:
+                comment.add_paragraph(text=line)
+
+        runs[0].mark_comment_range(runs[-1], next_id)
+        next_id += 1
+
+
+# Constructs whose meaning differs between re and RE2/Hyperscan whatever the
+# text: RE2 reads [:alpha:] as a POSIX class, and re reads {,n} as a 0-to-n
+# repeat where the others see literal text
+_RE_ONLY_SYNTAX = re.compile(r"\[:|\{,")
+
+# Text on which the engines still disagree about patterns that pass the
+# check above: re's \s also matches \v and \x1c-\x1f (and \S doesn't), and
+# re's $ also matches before a trailing newline
+_RE_ONLY_TEXT = re.compile(r"[\x0b\x1c-\x1f]|\n\Z")
+
+
+def _engines_agree_on_ascii(pattern: str) -> bool:
+    """
+    True if RE2 and Hyperscan read pattern the way re does, on text that
+    passes _engines_agree_on_text. On other text they don't: their \b, \w
+    and \d are ASCII-only and their case folding differs (re's "i" matches
+    "İ" when ignoring case).
+    """
+    return pattern.isascii() and _RE_ONLY_SYNTAX.search(pattern) is None
+
+
+def _engines_agree_on_text(text: str) -> bool:
+    """True if text is one RE2 and Hyperscan search the way re does."""
+    return text.isascii() and _RE_ONLY_TEXT.search(text) is None
+
+
+# The constructs behind the non-ASCII differences above: the ASCII-only
+# classes, and inline flags that may turn on case-insensitive matching
+_ASCII_ONLY_SYNTAX = re.compile(r"\\[bBwWdDsS]|\(\?[a-zA-Z-]*i")
+
+
+def _re2_agrees_on_unicode(pattern: str, case_sensitive: bool) -> bool:
+    """
+    True if RE2 reads pattern (already accepted by _engines_agree_on_ascii)
+    the way re does on any text not ending in a newline, ASCII or not.
+    """
+    return case_sensitive and _ASCII_ONLY_SYNTAX.search(pattern) is None
+
+
+class _Re2Pattern:
+    """A compiled regex searched by RE2 where it agrees with re, and by re otherwise."""
+
+    __slots__ = ("pattern", "_re", "_re2", "_unicode_safe")
+
+    def __init__(self, re_pattern: Pattern, re2_pattern, unicode_safe: bool):
+        self.pattern = re_pattern.pattern
+        self._re = re_pattern
+        self._re2 = re2_pattern
+        self._unicode_safe = unicode_safe
+
+    def search(self, text: str):
+        if self._unicode_safe:
+            agree = not text.endswith("\n")
+        else:
+            agree = _engines_agree_on_text(text)
+        if agree:
+            return self._re2.search(text)
+        return self._re.search(text)
+
+
+@functools.lru_cache(maxsize=256)
+def compile_matcher(
+    target_text: str,
+    match_type: str,
+    case_sensitive: bool,
+    whole_word: bool,
+) -> Optional[Pattern]:
+    """
+    Build (once) the compiled pattern for a target.
+    Returns None when a plain substring test is all that is needed.
+
+    Case-insensitive literal patterns are built from the casefolded target and
+    must be searched against casefolded text (see `uses_casefolded_text`).
+    Regex patterns always run against the original text with `re` semantics.
+    When RE2 is installed it does the search wherever it provably agrees with
+    `re` (see _Re2Pattern), so a pathological pattern can't backtrack for
+    minutes on a long paragraph.
+    """
+    if match_type == "regex":
+        pattern = target_text
+        if whole_word:
+            pattern = r"\b" + pattern + r"\b"
+        compiled = re.compile(pattern, 0 if case_sensitive else re.IGNORECASE)
+        if re2 is not None and _engines_agree_on_ascii(pattern):
+            options = re2.Options()
+            options.case_sensitive = case_sensitive
+            options.log_errors = False
+            try:
+                return _Re2Pattern(
+                    compiled,
+                    re2.compile(pattern, options),
+                    _re2_agrees_on_unicode(pattern, case_sensitive),
+                )
+            except re2.error:
+                # backreferences, lookaround, ...
+                pass
+        return compiled
+
+    # exact / literal: only word boundaries need a regex
+    if not whole_word:
+        return None
+    if not case_sensitive:
+        target_text = target_text.casefold()
+    return re.compile(r"\b" + re.escape(target_text) + r"\b")
+
+
+def uses_casefolded_text(match_type: str, case_sensitive: bool) -> bool:
+    return match_type != "regex" and not case_sensitive
+
+
+@functools.lru_cache(maxsize=256)
+def _casefolded_target(target_text: str) -> str:
+    return target_text.casefold()
 
 
 def match_text_in_paragraph(
@@ -158,35 +655,200 @@ def match_text_in_paragraph(
     """
     Return True if paragraph_text contains target_text according to the options.
     This is intentionally simple and operates at paragraph granularity.
+
+    Kept for outside callers and slow: a case-insensitive literal casefolds the
+    whole paragraph on every call. comment_docx normalizes each paragraph once
+    and matches every target in one pass instead, with the same patterns.
     """
-    if not case_sensitive:
-        paragraph_text_cmp = paragraph_text.lower()
-        target_text_cmp = target_text.lower()
+    if uses_casefolded_text(match_type, case_sensitive):
+        haystack, needle = paragraph_text.casefold(), _casefolded_target(target_text)
     else:
-        paragraph_text_cmp = paragraph_text
-        target_text_cmp = target_text
+        haystack, needle = paragraph_text, target_text
 
-    if match_type == "regex":
-        flags = 0
-        if not case_sensitive:
-            flags |= re.IGNORECASE
+    if match_type != "regex" and needle not in haystack:
+        # cheap reject before compiling or running the whole-word pattern
+        return False
 
-        pattern = target_text
-        if whole_word:
-            pattern = r"\b" + pattern + r"\b"
-
-        return re.search(pattern, paragraph_text, flags) is not None
-    else:
+    matcher = compile_matcher(target_text, match_type, case_sensitive, whole_word)
+    if matcher is None:
         # exact / literal substring match
-        if whole_word:
-            # crude whole word: regex word boundary
-            pattern = r"\b" + re.escape(target_text_cmp) + r"\b"
-            return re.search(pattern, paragraph_text_cmp) is not None
-        return target_text_cmp in paragraph_text_cmp
+        return True
+    return matcher.search(haystack) is not None
 
 
-def annotate_docx(input_path: str, output_path: str, annotations: List[Dict[str, Any]]):
-    doc = Document(input_path)
+def build_literal_automaton(literals: List[tuple]):
+    """
+    Build an Aho-Corasick automaton over casefolded literal targets.
+    `literals` is a list of (annotation_index, text); each key maps to the
+    tuple of annotation indices sharing it. Returns None if there are none.
+    """
+    keyed: Dict[str, List[int]] = {}
+    for ann_index, text in literals:
+        keyed.setdefault(text.casefold(), []).append(ann_index)
+
+    if not keyed:
+        return None
+
+    automaton = ahocorasick.Automaton()
+    for key, ann_indices in keyed.items():
+        automaton.add_word(key, tuple(ann_indices))
+    automaton.make_automaton()
+    return automaton
+
+
+# Below this many eligible regex targets a Hyperscan scan costs about as much
+# as testing them directly with re, so no database is built
+HYPERSCAN_MIN_PATTERNS = 2
+
+
+def build_regex_database(regexes: List[tuple]) -> tuple:
+    """
+    Compile regex targets, given as (annotation_index, pattern, case_sensitive),
+    into a single Hyperscan database so each paragraph is scanned once for all
+    of them. Patterns are compiled in prefilter mode: hits are candidates that
+    still have to be confirmed with `re`.
+
+    A prefilter must never miss a real match, so only patterns Hyperscan reads
+    like re are included, and the database may only be used on text that
+    passes _engines_agree_on_text. Returns (database, annotation indices for
+    each database id); annotations not listed are tested directly. The
+    database is None when Hyperscan is not installed, there are too few
+    targets to pay for it, or it rejects the set.
+    """
+    if hyperscan is None:
+        return None, ()
+    keyed: Dict[tuple, List[int]] = {}
+    for ann_index, pattern, case_sensitive in regexes:
+        if _engines_agree_on_ascii(pattern):
+            keyed.setdefault((pattern, case_sensitive), []).append(ann_index)
+    if len(keyed) < HYPERSCAN_MIN_PATTERNS:
+        return None, ()
+
+    db = _compile_regex_database(tuple(keyed))
+    if db is None:
+        return None, ()
+    return db, tuple(tuple(ann_indices) for ann_indices in keyed.values())
+
+
+@functools.lru_cache(maxsize=32)
+def _compile_regex_database(keys: tuple):
+    """
+    The Hyperscan database for (pattern, case_sensitive) keys, with each key's
+    position as its id. Cached, since compiling costs far more than a scan.
+    The database is only scanned on ASCII text, so it is compiled without
+    UTF-8/Unicode support, which would make compiling many times slower.
+    """
+    base_flags = (
+        hyperscan.HS_FLAG_SINGLEMATCH
+        | hyperscan.HS_FLAG_ALLOWEMPTY
+        | hyperscan.HS_FLAG_PREFILTER
+    )
+    expressions = [pattern.encode("ascii") for pattern, _ in keys]
+    flags = [
+        base_flags if case_sensitive else base_flags | hyperscan.HS_FLAG_CASELESS
+        for _, case_sensitive in keys
+    ]
+
+    db = hyperscan.Database()
+    try:
+        db.compile(expressions=expressions, ids=list(range(len(keys))), elements=len(keys), flags=flags)
+    except hyperscan.error:
+        return None
+    return db
+
+
+def _collect_regex_hit(pattern_id, start, end, flags, context):
+    ann_ids, hits = context
+    hits.update(ann_ids[pattern_id])
+
+
+# The same inner-content elements python-docx's Paragraph.text reads (runs,
+# including hyperlinked runs), gathered with one compiled XPath per paragraph.
+_PARAGRAPH_TEXT_XPATH = etree.XPath(
+    "(w:r | w:hyperlink/w:r)/*[self::w:t or self::w:tab or self::w:br"
+    " or self::w:cr or self::w:noBreakHyphen or self::w:ptab]",
+    namespaces={"w": nsmap["w"]},
+)
+
+
+def paragraph_text(p_elm) -> str:
+    """Text of a w:p element, identical to python-docx's Paragraph.text."""
+    # The oxml element classes translate tabs/breaks in their __str__
+    return "".join(map(str, _PARAGRAPH_TEXT_XPATH(p_elm)))
+
+
+def _open_docx(doc_or_path: Union[str, IO[bytes], Document]) -> Document:
+    if isinstance(doc_or_path, docx.document.Document):
+        return doc_or_path
+    # A path or file-like stream, as Document() accepts
+    return Document(doc_or_path)
+
+
+def annotate_docx(doc_or_path: Union[str, IO[bytes], Document], output_path: str, annotations: List[Dict[str, Any]]):
+    """
+    Comment the matching paragraphs and save to output_path. Accepts a path, a
+    file-like stream or an already opened Document (which is modified in
+    place), so callers that parsed the file to extract its text don't have to
+    parse it again.
+    """
+    doc = _open_docx(doc_or_path)
+    comment_docx(doc, annotations)
+    doc.save(output_path)
+
+
+def annotate_docx_stream(
+    doc_or_path: Union[str, IO[bytes], Document],
+    output_path: str,
+    annotations: Iterable[Dict[str, Any]],
+    on_applied: Optional[Callable[[int], None]] = None,
+) -> int:
+    """
+    Like annotate_docx, but consumes annotations as they are produced (e.g.
+    from generate_annotations_stream), applying each one on arrival to the
+    document opened once. on_applied is called with the running count.
+    Returns the number of annotations applied.
+    """
+    doc = _open_docx(doc_or_path)
+    # Paragraph text is extracted once and shared by every arrival; comments
+    # added along the way don't change it. It is built when the first
+    # annotation arrives, so it overlaps the model generating the rest
+    paragraphs = None
+    applied = 0
+    for ann in annotations:
+        if paragraphs is None:
+            paragraphs = list(docx_paragraph_texts(doc))
+        comment_docx(doc, [ann], paragraphs)
+        applied += 1
+        if on_applied is not None:
+            on_applied(applied)
+    doc.save(output_path)
+    return applied
+
+
+def docx_paragraph_texts(doc: Document) -> Iterator[tuple]:
+    """
+    Normalize each body paragraph once: (w:p element, text, casefolded, is_blank).
+    Read straight from the body XML; the python-docx Paragraph wrapper is only
+    built for paragraphs that actually get a comment. Produced lazily so an
+    early exit in comment_docx also skips extracting the rest.
+    """
+    for p in doc.element.body.iterchildren(qn("w:p")):
+        t = paragraph_text(p)
+        yield p, t, t.casefold(), not t.strip()
+
+
+def comment_docx(
+    doc: Document,
+    annotations: List[Dict[str, Any]],
+    paragraphs: Optional[Iterable[tuple]] = None,
+):
+    """
+    Add the comments for `annotations` to an open Document, without saving.
+    paragraphs, if given, is a reusable docx_paragraph_texts(doc) list.
+    """
+    specs: List[Dict[str, Any]] = []
+    literals: List[tuple] = []  # (spec index, text) for the automaton
+    regex_ids: List[int] = []
 
     for ann in annotations:
         target = ann.get("target", {})
@@ -204,56 +866,358 @@ def annotate_docx(input_path: str, output_path: str, annotations: List[Dict[str,
         match_type = target.get("match_type", "exact")
         case_sensitive = target.get("case_sensitive", False)
         whole_word = target.get("whole_word", True)
-        occurrence = target.get("occurrence", "first")
-
-        comment_text = comment_spec.get("text", "")
-        author = comment_spec.get("author", "Reviewer")
+        occ_num = occurrence_number(target.get("occurrence", "first"))
+
+        spec_id = len(specs)
+        specs.append({
+            "text": text,
+            "case_sensitive": case_sensitive,
+            "regex": match_type == "regex",
+            "casefolded": uses_casefolded_text(match_type, case_sensitive),
+            # Compile once per annotation rather than once per paragraph
+            "matcher": compile_matcher(text, match_type, case_sensitive, whole_word),
+            "occ_num": occ_num,
+            "comment_text": comment_spec.get("text", ""),
+            "author": comment_spec.get("author", "Reviewer"),
+        })
+
+        if specs[spec_id]["regex"]:
+            regex_ids.append(spec_id)
+        else:
+            literals.append((spec_id, text))
+
+    automaton = build_literal_automaton(literals)
+    regex_db, regex_db_ids = build_regex_database([
+        (spec_id, specs[spec_id]["matcher"].pattern, specs[spec_id]["case_sensitive"])
+        for spec_id in regex_ids
+    ])
+    prefiltered_ids = frozenset(i for spec_ids in regex_db_ids for i in spec_ids)
+
+    # We'll count matches over paragraphs in reading order, scanning each
+    # paragraph once for all targets.
+    match_counts = [0] * len(specs)
+    finished = [False] * len(specs)
+    pending_comments: List[tuple] = []  # (paragraph, comment_text, author)
+    # "first"/nth annotations finish at their hit; "all" ones never do.
+    # Finished ones drop out of the per-paragraph work below.
+    unfinished = len(specs)
+    unfinished_literals = len(literals)
+    pending_regex_ids = list(regex_ids)
+
+    if paragraphs is None:
+        paragraphs = docx_paragraph_texts(doc)
+
+    for p_elm, para_text, para_cf, is_blank in paragraphs:
+        if not unfinished:
+            # Every annotation has placed its comment; the rest can't matter
+            break
+        if is_blank:
+            continue
 
-        # We'll count matches over paragraphs in reading order
-        match_count = 0
+        candidates = set()
+        if automaton is not None and unfinished_literals:
+            for _, spec_ids in automaton.iter(para_cf):
+                candidates.update(spec_ids)
+        if regex_db is not None and pending_regex_ids and _engines_agree_on_text(para_text):
+            regex_db.scan(
+                para_text.encode("ascii"),
+                match_event_handler=_collect_regex_hit,
+                context=(regex_db_ids, candidates),
+            )
+            # Patterns left out of the database are always tested directly
+            candidates.update(i for i in pending_regex_ids if i not in prefiltered_ids)
+        else:
+            candidates.update(pending_regex_ids)
 
-        for paragraph in doc.paragraphs:
-            para_text = paragraph.text or ""
-            if not para_text.strip():
+        paragraph = None
+        for spec_id in sorted(candidates):
+            if finished[spec_id]:
                 continue
+            spec = specs[spec_id]
 
-            if not match_text_in_paragraph(
-                para_text, text, match_type, case_sensitive, whole_word
-            ):
+            # The automaton is case-insensitive and ignores word boundaries,
+            # and Hyperscan only prefilters, so every hit is verified here.
+            # Case-sensitive literals get a cheap substring reject first
+            if spec["case_sensitive"] and not spec["regex"] and spec["text"] not in para_text:
                 continue
+            if spec["matcher"] is not None:
+                haystack = para_cf if spec["casefolded"] else para_text
+                if spec["matcher"].search(haystack) is None:
+                    continue
 
             # We have a match in this paragraph
-            match_count += 1
+            match_counts[spec_id] += 1
 
-            if occurrence == "all":
-                add_comment_to_paragraph(doc, paragraph, comment_text, author)
+            occ_num = spec["occ_num"]
+            if occ_num is not None and match_counts[spec_id] != occ_num:
                 continue
 
-            # occurrence can be "first" or a specific integer
-            if occurrence == "first":
-                if match_count == 1:
-                    add_comment_to_paragraph(doc, paragraph, comment_text, author)
-                    break
-            else:
-                try:
-                    occ_num = int(occurrence)
-                except Exception:
-                    occ_num = 1
-                if match_count == occ_num:
-                    add_comment_to_paragraph(doc, paragraph, comment_text, author)
-                    break
+            if paragraph is None:
+                paragraph = Paragraph(p_elm, doc._body)
+            pending_comments.append((paragraph, spec["comment_text"], spec["author"]))
 
-    doc.save(output_path)
+            if occ_num is not None:
+                finished[spec_id] = True
+                unfinished -= 1
+                if spec["regex"]:
+                    pending_regex_ids.remove(spec_id)
+                else:
+                    unfinished_literals -= 1
+
+    add_comments_to_paragraphs(doc, pending_comments)
 
 
 # ==========================================================
 # PDF ANNOTATION
 # ==========================================================
 
-def annotate_pdf(input_path: str, output_path: str, annotations: List[Dict[str, Any]]):
+# Same text extraction flags page.search_for uses by default, so the
+# prefilter below sees the text exactly as the search will.
+PDF_SEARCH_FLAGS = (
+    fitz.TEXT_DEHYPHENATE
+    | fitz.TEXT_PRESERVE_WHITESPACE
+    | fitz.TEXT_PRESERVE_LIGATURES
+    | fitz.TEXT_MEDIABOX_CLIP
+)
+
+
+def normalize_whitespace(text: str) -> str:
+    return " ".join(text.split())
+
+
+# Pages each worker process must get before a pool is worth it. A spawned
+# worker takes ~0.7s to import this module and reopen the PDF, against a few
+# milliseconds per page scanned in-process.
+PDF_PARALLEL_MIN_PAGES = 200
+
+
+def collect_pdf_literals(annotations: List[Dict[str, Any]]) -> List[tuple]:
+    """
+    Return (annotation_index, normalized_text, text, occ_num) for each
+    text-mode annotation; occ_num is None when every match is wanted.
+    """
+    literals: List[tuple] = []
+    for ann_index, ann in enumerate(annotations):
+        target = ann.get("target", {})
+        if target.get("mode", "text") == "position":
+            continue
+        text = target.get("text", "")
+        normalized = normalize_whitespace(text)
+        if normalized:
+            occ_num = occurrence_number(target.get("occurrence", "first"))
+            literals.append((ann_index, normalized, text, occ_num))
+    return literals
+
+
+def pdf_page_texts(doc, page_indices) -> Iterator[tuple]:
+    """
+    (page_index, page, textpage, normalized casefolded text) for each page.
+    The page object is kept alongside its TextPage, which is only valid
+    while the page is.
+    """
+    for page_index in page_indices:
+        page = doc[page_index]
+        textpage = page.get_textpage(flags=PDF_SEARCH_FLAGS)
+        yield page_index, page, textpage, normalize_whitespace(textpage.extractText()).casefold()
+
+
+def pdf_text_index(doc) -> List[tuple]:
+    """
+    pdf_page_texts for the whole document with the page and TextPage dropped,
+    reusable across find_pdf_matches calls. Only the text is kept: MuPDF's
+    annotation updates slow down with every page held open.
+    """
+    return [(page_index, None, None, page_cf) for page_index, _, _, page_cf in pdf_page_texts(doc, range(len(doc)))]
+
+
+def find_pdf_matches(
+    doc,
+    literals: List[tuple],
+    page_indices,
+    pages: Optional[Iterable[tuple]] = None,
+) -> Dict[int, List[tuple]]:
+    """
+    Map each annotation index to its (page_index, rect) matches in reading order.
+
+    Every page's text is extracted once and scanned once for all targets;
+    page.search_for then runs, on that same TextPage, only for the targets the
+    page can actually contain. A "first"/nth target stops being searched once
+    it has that many matches. pages, if given, is a pdf_text_index list and
+    replaces page_indices; a page is then only loaded if it has a hit.
+    """
+    matches: Dict[int, List[tuple]] = {}
+    automaton = build_literal_automaton([(i, normalized) for i, normalized, _, _ in literals])
+    if automaton is None:
+        return matches
+
+    texts = {ann_index: text for ann_index, _, text, _ in literals}
+    occ_nums = {ann_index: occ_num for ann_index, _, _, occ_num in literals}
+    unfinished = len(literals)
+    if pages is None:
+        pages = pdf_page_texts(doc, page_indices)
+
+    for page_index, page, textpage, page_cf in pages:
+        if not unfinished:
+            # Every target already has the match it needs
+            break
+        hit_ids = set()
+        for _, ann_ids in automaton.iter(page_cf):
+            hit_ids.update(i for i in ann_ids if i in occ_nums)
+        if not hit_ids:
+            continue
+        if page is None:
+            page = doc[page_index]
+            textpage = page.get_textpage(flags=PDF_SEARCH_FLAGS)
+
+        for ann_index in hit_ids:
+            rects = page.search_for(texts[ann_index], textpage=textpage)  # simple literal search
+            for r in rects:
+                matches.setdefault(ann_index, []).append((page_index, r))
+
+            occ_num = occ_nums[ann_index]
+            if occ_num is not None and len(matches.get(ann_index, ())) >= occ_num:
+                del occ_nums[ann_index]
+                unfinished -= 1
+
+    return matches
+
+
+def _find_pdf_matches_in_range(input_path: str, literals: List[tuple], start: int, stop: int):
+    """Worker-process entry point: scan pages [start, stop) of the PDF at input_path."""
     doc = fitz.open(input_path)
+    try:
+        matches = find_pdf_matches(doc, literals, range(start, stop))
+    finally:
+        doc.close()
+    # Plain tuples pickle cheaply back to the parent process
+    return {
+        ann_index: [(page_index, tuple(rect)) for page_index, rect in hits]
+        for ann_index, hits in matches.items()
+    }
+
+
+def find_all_pdf_matches(
+    doc,
+    input_path: str,
+    literals: List[tuple],
+    workers: int = 1,
+) -> Dict[int, List[tuple]]:
+    """
+    Run find_pdf_matches over the whole document. With workers > 1, large PDFs
+    are split into page ranges scanned by up to that many worker processes.
+    PyMuPDF is not thread-safe and holds the GIL, so each worker opens its own
+    copy of the file instead.
+
+    Workers are spawned rather than forked (forking a multi-threaded process
+    can deadlock the child), and spawned children re-import the caller's main
+    module. Only pass workers > 1 from a program whose main module has an
+    `if __name__ == "__main__"` guard, and which calls
+    multiprocessing.freeze_support() if it is frozen.
+    """
+    page_count = len(doc)
+    workers = min(workers, page_count // PDF_PARALLEL_MIN_PAGES)
+    if workers < 2 or not literals:
+        return find_pdf_matches(doc, literals, range(page_count))
+
+    step = -(-page_count // workers)  # ceil division
+    bounds = [(start, min(start + step, page_count)) for start in range(0, page_count, step)]
+
+    matches: Dict[int, List[tuple]] = {}
+    with concurrent.futures.ProcessPoolExecutor(
+        max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+    ) as pool:
+        futures = [
+            pool.submit(_find_pdf_matches_in_range, input_path, literals, start, stop)
+            for start, stop in bounds
+        ]
+        # Merge in page-range order to keep matches in reading order
+        for future in futures:
+            for ann_index, hits in future.result().items():
+                matches.setdefault(ann_index, []).extend(
+                    (page_index, fitz.Rect(rect)) for page_index, rect in hits
+                )
+    return matches
+
+
+def highlight_rects(doc, rects: List[tuple], content: str):
+    """
+    Highlight (page_index, rect) matches and attach `content` as the comment.
+    All matches on one page share a single multi-quad highlight annotation,
+    so each page costs one add/set_info/update round-trip into MuPDF.
+    """
+    quads_by_page: Dict[int, list] = {}
+    for p_idx, rect in rects:
+        quads_by_page.setdefault(p_idx, []).append(rect.quad)
 
+    for p_idx, quads in quads_by_page.items():
+        page = doc[p_idx]  # the annotation is only valid while its page is alive
+        highlight = page.add_highlight_annot(quads)
+        highlight.set_info(content=content)
+        highlight.update()
+
+
+def annotate_pdf(input_path: str, output_path: str, annotations: List[Dict[str, Any]], workers: int = 1):
+    """
+    Highlight the matching text and save to output_path. workers > 1 lets a
+    large PDF be searched in that many processes (see find_all_pdf_matches).
+    """
+    doc = fitz.open(input_path)
+    annotate_pdf_doc(doc, input_path, annotations, workers=workers)
+    doc.save(output_path)
+    doc.close()
+
+
+def annotate_pdf_stream(
+    input_path: str,
+    output_path: str,
+    annotations: Iterable[Dict[str, Any]],
+    on_applied: Optional[Callable[[int], None]] = None,
+) -> int:
+    """
+    Like annotate_pdf, but consumes annotations as they are produced, applying
+    each one on arrival to the document opened once. on_applied is called with
+    the running count. Returns the number of annotations applied.
+    """
+    doc = fitz.open(input_path)
+    # Every page's text is extracted once and scanned in-process for each
+    # arrival, instead of re-extracting (or starting a process pool) per
+    # annotation. The index is built when the first annotation arrives, so it
+    # overlaps the model generating the rest
+    pages = None
+    applied = 0
     for ann in annotations:
+        if pages is None:
+            pages = pdf_text_index(doc)
+        annotate_pdf_doc(doc, input_path, [ann], pages)
+        applied += 1
+        if on_applied is not None:
+            on_applied(applied)
+    doc.save(output_path)
+    doc.close()
+    return applied
+
+
+def annotate_pdf_doc(
+    doc,
+    input_path: str,
+    annotations: List[Dict[str, Any]],
+    pages: Optional[List[tuple]] = None,
+    workers: int = 1,
+):
+    """
+    Add the annotations to an open fitz document read from input_path, without saving.
+    pages, if given, is a pdf_text_index(doc) list reused across calls; otherwise
+    the pages are searched with up to `workers` processes (see find_all_pdf_matches).
+    """
+    # All text targets are located up front; annotating below never changes
+    # the page text, so the matches stay valid.
+    literals = collect_pdf_literals(annotations)
+    if pages is not None:
+        matches_by_ann = find_pdf_matches(doc, literals, None, pages)
+    else:
+        matches_by_ann = find_all_pdf_matches(doc, input_path, literals, workers)
+
+    for ann_index, ann in enumerate(annotations):
         target = ann.get("target", {})
         comment_spec = ann.get("comment", {})
         mode = target.get("mode", "text")
@@ -281,46 +1245,21 @@ def annotate_pdf(input_path: str, output_path: str, annotations: List[Dict[str,
         if not text:
             continue
 
-        occurrence = target.get("occurrence", "first")
+        occ_num = occurrence_number(target.get("occurrence", "first"))
         # match_type, case_sensitive, whole_word are not fully handled here;
         # PyMuPDF search_for is literal and reasonably good for basic use.
 
-        matches_global: List[tuple] = []  # (page_index, rect)
-
-        for page_index in range(len(doc)):
-            page = doc[page_index]
-            rects = page.search_for(text)  # simple literal search
-            for r in rects:
-                matches_global.append((page_index, r))
+        matches_global: List[tuple] = matches_by_ann.get(ann_index, [])  # (page_index, rect)
 
         if not matches_global:
             continue
 
-        def apply_comment_to_rects(rects: List[tuple]):
-            for p_idx, rect in rects:
-                page = doc[p_idx]
-                # highlight the text and attach the comment
-                highlight = page.add_highlight_annot(rect)
-                highlight.set_info(info={"content": f"{author}: {comment_text}"})
-                highlight.update()
-
-        if occurrence == "all":
-            apply_comment_to_rects(matches_global)
-        else:
+        content = f"{author}: {comment_text}"
+        if occ_num is None:
+            highlight_rects(doc, matches_global, content)
+        elif 1 <= occ_num <= len(matches_global):
             # first or nth
-            if occurrence == "first":
-                idx = 1
-            else:
-                try:
-                    idx = int(occurrence)
-                except Exception:
-                    idx = 1
-
-            if 1 <= idx <= len(matches_global):
-                apply_comment_to_rects([matches_global[idx - 1]])
-
-    doc.save(output_path)
-    doc.close()
+            highlight_rects(doc, [matches_global[occ_num - 1]], content)
 
 
 # ==========================================================
@@ -367,7 +1306,8 @@ def main():
     if ext_lower == ".docx":
         annotate_docx(doc_path, out_path, annotations)
     elif ext_lower == ".pdf":
-        annotate_pdf(doc_path, out_path, annotations)
+        # Safe here: this is the entry point, behind a __main__ guard
+        annotate_pdf(doc_path, out_path, annotations, workers=os.cpu_count() or 1)
     else:
         print("Only .docx and .pdf are supported.", file=sys.stderr)
         sys.exit(1)
@@ -1,31 +1,257 @@
 import sys
 import os
+import hashlib
+import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import closing
+from dataclasses import dataclass
+import orjson
 from PyQt6.QtWidgets import (QApplication, QWidget, QVBoxLayout, QHBoxLayout, 
-                             QLabel, QLineEdit, QPushButton, QFileDialog, QMessageBox)
-from PyQt6.QtCore import Qt
-import comment  # Import the comment module
+                             QLabel, QLineEdit, QPushButton, QFileDialog, QMessageBox,
+                             QCheckBox, QProgressBar)
+from PyQt6.QtCore import Qt, QObject, QThread, QSettings, QTimer, pyqtSignal, pyqtSlot
+
+# comment pulls in OpenAI, python-docx and PyMuPDF, so it is imported only
+# once the window is up. Always reach it through load_comment_module().
+_comment_module = None
+
+# --- Optional keyring import (remembering the API key) ---
+try:
+    import keyring
+except ImportError:
+    keyring = None
+
+DOCUMENT_EXTENSIONS = {".docx", ".pdf"}
+SIDE_DOCUMENT_EXTENSIONS = {".docx", ".pdf", ".txt"}
+
+KEYRING_SERVICE = "commenter"
+KEYRING_USERNAME = "openai"
+
+# Extracted side-document text, keyed on content, shared by every paper graded against it
+KB_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".commenter", "kb-cache")
+
+# Annotations already generated for an identical set of inputs are reused
+CACHE_PATH = os.path.join(os.path.expanduser("~"), ".commenter", "cache.sqlite")
+
+
+def load_comment_module():
+    """Import the comment module on first use and return it."""
+    global _comment_module
+    if _comment_module is None:
+        import comment
+        _comment_module = comment
+    return _comment_module
+
+
+def _load_bytes(path):
+    if not path:
+        return b""
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def load_side_documents(rubric_path, assign_kb_path, general_kb_path):
+    """Read the rubric and both KBs concurrently; returns their bytes in that order."""
+    paths = (rubric_path, assign_kb_path, general_kb_path)
+    data = [b""] * len(paths)
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        futures = {pool.submit(_load_bytes, path): i for i, path in enumerate(paths)}
+        for future in as_completed(futures):
+            data[futures[future]] = future.result()
+    return tuple(data)
+
+
+def cached_side_text(path, data):
+    """
+    Text of an already-read side document, extracted once per distinct
+    content and extension and kept under KB_CACHE_DIR.
+    """
+    if not data:
+        return ""
+    ext = os.path.splitext(path)[1].lower().lstrip(".")
+    cache_path = os.path.join(KB_CACHE_DIR, f"{hashlib.blake2b(data, digest_size=32).hexdigest()}-{ext}.txt")
+    try:
+        with open(cache_path, "r", encoding="utf-8") as f:
+            return f.read()
+    except (OSError, UnicodeDecodeError):
+        # Missing or unreadable entry: extract directly
+        pass
+
+    text = load_comment_module().extract_text_from_bytes(path, data)
+    # Extraction failures also come back as "" and must not be kept for good
+    if not text:
+        return text
+
+    # Write then rename, so a concurrent reader never sees a partial entry
+    tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(KB_CACHE_DIR, exist_ok=True)
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(text)
+        os.replace(tmp_path, cache_path)
+    except OSError as e:
+        print(f"Could not cache extracted text of {path}: {e}")
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return text
+
+
+def _file_digest(path, data=None):
+    """blake2b digest of a file's contents, streamed; blank/missing paths hash as empty."""
+    h = hashlib.blake2b(digest_size=32)
+    if data is not None:
+        h.update(data)
+    elif path and os.path.exists(path):
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                h.update(chunk)
+    return h.digest()
+
+
+def annotations_cache_key(doc_path, rubric_path, assign_kb_path, general_kb_path, side_data=None):
+    comment = load_comment_module()
+    key = hashlib.blake2b(digest_size=32)
+    key.update(f"{comment.PROMPT_VERSION}:{comment.GRADING_MODEL}".encode())
+    key.update(_file_digest(doc_path))
+    side_data = side_data or (None, None, None)
+    for path, data in zip((rubric_path, assign_kb_path, general_kb_path), side_data):
+        key.update(_file_digest(path, data))
+    return key.digest()
+
+
+def _open_cache():
+    os.makedirs(os.path.dirname(CACHE_PATH), exist_ok=True)
+    db = sqlite3.connect(CACHE_PATH)
+    db.execute(
+        "CREATE TABLE IF NOT EXISTS annotations "
+        "(key BLOB PRIMARY KEY, created REAL, annotations BLOB)"
+    )
+    return db
+
+
+def load_cached_annotations(key):
+    """
+    The annotations stored under key, or None on a miss. The cache is only
+    an optimisation: one that can't be opened or read counts as a miss.
+    """
+    try:
+        with closing(_open_cache()) as db:
+            row = db.execute("SELECT annotations FROM annotations WHERE key = ?", (key,)).fetchone()
+        return None if row is None else orjson.loads(row[0])
+    except (OSError, sqlite3.Error, orjson.JSONDecodeError) as e:
+        print(f"Annotation cache unavailable, skipping lookup: {e}")
+        return None
+
+
+def store_cached_annotations(key, annotations):
+    # Runs after a paid LLM call: failing to cache must not fail the run
+    try:
+        with closing(_open_cache()) as db, db:
+            db.execute(
+                "INSERT OR REPLACE INTO annotations (key, created, annotations) VALUES (?, ?, ?)",
+                (key, time.time(), orjson.dumps(annotations)),
+            )
+    except (OSError, sqlite3.Error) as e:
+        print(f"Could not store annotations in the cache: {e}")
+
+
+def generate_and_cache_annotations_stream(key, doc_path, rubric_path, assign_kb_path, general_kb_path,
+                                          doc_text=None, side_data=None, client=None):
+    """
+    comment.generate_annotations_stream, storing the result under key (see
+    annotations_cache_key) once the stream has completed. side_data, if given,
+    is the already-read (rubric, assign_kb, general_kb) bytes; their extracted
+    text is then taken from the KB cache.
+    """
+    rubric_text = assign_kb_text = general_kb_text = None
+    if side_data is not None:
+        rubric_text, assign_kb_text, general_kb_text = (
+            cached_side_text(path, data)
+            for path, data in zip((rubric_path, assign_kb_path, general_kb_path), side_data)
+        )
+    annotations = []
+    for annotation in load_comment_module().generate_annotations_stream(
+        doc_path, 
+        rubric_path, 
+        assign_kb_path, 
+        general_kb_path,
+        doc_text=doc_text,
+        side_data=side_data,
+        client=client,
+        prebuilt_rubric=rubric_text,
+        prebuilt_assign_kb=assign_kb_text,
+        prebuilt_general_kb=general_kb_text
+    ):
+        annotations.append(annotation)
+        yield annotation
+
+    store_cached_annotations(key, annotations)
+
+
+@dataclass(frozen=True)
+class Job:
+    """Paths for one run, derived once from the validated input document."""
+    doc_path: str
+    ext: str  # lower-cased, e.g. ".docx"
+    base: str
+    out_path: str
+    out_name: str
+
+    @classmethod
+    def for_document(cls, doc_path):
+        base, ext = os.path.splitext(doc_path)
+        out_path = f"{base}-annotated{ext}"
+        # Never overwrite an earlier result: it cost an LLM call to produce
+        i = 2
+        while os.path.exists(out_path):
+            out_path = f"{base}-annotated-{i}{ext}"
+            i += 1
+        return cls(doc_path=doc_path, ext=ext.lower(), base=base, out_path=out_path,
+                   out_name=os.path.basename(out_path))
+
 
 class CommenterApp(QWidget):
     def __init__(self):
         super().__init__()
+        self._thread = None
+        self._worker = None
+        self._job = None
+        self.settings = QSettings("commenter", "gui")
+        self._annotators = {}
+        self._busy = False
         self.initUI()
 
     def initUI(self):
         self.setWindowTitle('Document Commenter UI')
         self.setGeometry(300, 300, 600, 400)
+        geometry = self.settings.value("geometry")
+        if geometry is not None:
+            self.restoreGeometry(geometry)
 
         layout = QVBoxLayout()
 
+        # Browse button -> (entry, dialog title, filter, settings tag)
+        self._browse_targets = {}
+
         # --- OpenAI API Key ---
         layout.addWidget(QLabel('OpenAI API Key:'))
         self.entry_api_key = QLineEdit()
         self.entry_api_key.setEchoMode(QLineEdit.EchoMode.Password)
-        # Try to load from env
-        env_key = os.environ.get("OPENAI_API_KEY", "")
-        if env_key:
-            self.entry_api_key.setText(env_key)
+        # A remembered key wins; otherwise try to load from env
+        stored_key = self._stored_api_key()
+        api_key = stored_key or os.environ.get("OPENAI_API_KEY", "")
+        if api_key:
+            self.entry_api_key.setText(api_key)
         layout.addWidget(self.entry_api_key)
 
+        self.chk_remember_key = QCheckBox('Remember API key (system keyring)')
+        self.chk_remember_key.setChecked(bool(stored_key))
+        if keyring is None:
+            self.chk_remember_key.setEnabled(False)
+            self.chk_remember_key.setToolTip("Install the keyring package to enable this.")
+        layout.addWidget(self.chk_remember_key)
+
         # --- Input Document Selection ---
         layout.addWidget(QLabel('Input Document (Paper to Grade):'))
         
@@ -34,7 +260,8 @@ class CommenterApp(QWidget):
         doc_layout.addWidget(self.entry_doc)
         
         btn_browse_doc = QPushButton('Browse')
-        btn_browse_doc.clicked.connect(lambda: self.browse_file(self.entry_doc, "Select Input Document", "Documents (*.docx *.pdf)"))
+        btn_browse_doc.clicked.connect(self._on_browse)
+        self._browse_targets[btn_browse_doc] = (self.entry_doc, "Select Input Document", "Documents (*.docx *.pdf)", "doc")
         doc_layout.addWidget(btn_browse_doc)
         
         layout.addLayout(doc_layout)
@@ -45,7 +272,8 @@ class CommenterApp(QWidget):
         self.entry_rubric = QLineEdit()
         rubric_layout.addWidget(self.entry_rubric)
         btn_browse_rubric = QPushButton('Browse')
-        btn_browse_rubric.clicked.connect(lambda: self.browse_file(self.entry_rubric, "Select Rubric", "Documents (*.docx *.pdf *.txt)"))
+        btn_browse_rubric.clicked.connect(self._on_browse)
+        self._browse_targets[btn_browse_rubric] = (self.entry_rubric, "Select Rubric", "Documents (*.docx *.pdf *.txt)", "rubric")
         rubric_layout.addWidget(btn_browse_rubric)
         layout.addLayout(rubric_layout)
 
@@ -55,7 +283,8 @@ class CommenterApp(QWidget):
         self.entry_assign_kb = QLineEdit()
         assign_kb_layout.addWidget(self.entry_assign_kb)
         btn_browse_assign_kb = QPushButton('Browse')
-        btn_browse_assign_kb.clicked.connect(lambda: self.browse_file(self.entry_assign_kb, "Select Assignment KB", "Documents (*.docx *.pdf *.txt)"))
+        btn_browse_assign_kb.clicked.connect(self._on_browse)
+        self._browse_targets[btn_browse_assign_kb] = (self.entry_assign_kb, "Select Assignment KB", "Documents (*.docx *.pdf *.txt)", "assign_kb")
         assign_kb_layout.addWidget(btn_browse_assign_kb)
         layout.addLayout(assign_kb_layout)
 
@@ -65,10 +294,16 @@ class CommenterApp(QWidget):
         self.entry_general_kb = QLineEdit()
         general_kb_layout.addWidget(self.entry_general_kb)
         btn_browse_general_kb = QPushButton('Browse')
-        btn_browse_general_kb.clicked.connect(lambda: self.browse_file(self.entry_general_kb, "Select General KB", "Documents (*.docx *.pdf *.txt)"))
+        btn_browse_general_kb.clicked.connect(self._on_browse)
+        self._browse_targets[btn_browse_general_kb] = (self.entry_general_kb, "Select General KB", "Documents (*.docx *.pdf *.txt)", "general_kb")
         general_kb_layout.addWidget(btn_browse_general_kb)
         layout.addLayout(general_kb_layout)
 
+        # --- Cache ---
+        self.chk_use_cache = QCheckBox('Use cache (reuse results for identical inputs)')
+        self.chk_use_cache.setChecked(True)
+        layout.addWidget(self.chk_use_cache)
+
         # --- Run Button ---
         self.btn_run = QPushButton('Run Commenter')
         self.btn_run.clicked.connect(self.run_commenter)
@@ -80,66 +315,267 @@ class CommenterApp(QWidget):
         self.lbl_status.setAlignment(Qt.AlignmentFlag.AlignCenter)
         layout.addWidget(self.lbl_status)
 
+        # --- Progress Bar ---
+        self.progress_bar = QProgressBar()
+        self.progress_bar.setRange(0, 1)
+        self.progress_bar.setValue(0)
+        layout.addWidget(self.progress_bar)
+
         self.setLayout(layout)
 
-    def browse_file(self, line_edit, title, filter_str):
-        file_path, _ = QFileDialog.getOpenFileName(self, title, "", filter_str + ";;All Files (*)")
+        # Runs as soon as the event loop starts, i.e. after the window is shown
+        QTimer.singleShot(0, self._warm_imports)
+
+    def _warm_imports(self):
+        comment = load_comment_module()
+        # Extension -> (batch annotator, streaming annotator); all accept the
+        # input path, and the DOCX ones an open document too
+        self._annotators = {
+            ".docx": (comment.annotate_docx, comment.annotate_docx_stream),
+            ".pdf": (comment.annotate_pdf, comment.annotate_pdf_stream),
+        }
+
+    @pyqtSlot()
+    def _on_browse(self):
+        self.browse_file(*self._browse_targets[self.sender()])
+
+    def browse_file(self, line_edit, title, filter_str, tag):
+        # Start where this field's last file came from rather than the cwd
+        start_dir = self.settings.value(f"last_{tag}_dir", "", type=str)
+        # Skipping symlink resolution keeps cloud-synced folders from stalling the dialog
+        file_path, _ = QFileDialog.getOpenFileName(
+            self, title, start_dir, filter_str + ";;All Files (*)",
+            options=QFileDialog.Option.DontResolveSymlinks | QFileDialog.Option.ReadOnly,
+        )
         if file_path:
             line_edit.setText(file_path)
+            self.settings.setValue(f"last_{tag}_dir", os.path.dirname(file_path))
+
+    def _stored_api_key(self):
+        if keyring is None:
+            return None
+        try:
+            return keyring.get_password(KEYRING_SERVICE, KEYRING_USERNAME)
+        except keyring.errors.KeyringError:
+            return None
+
+    def _remember_api_key(self, api_key):
+        """Store or forget the key in the keyring, per the Remember checkbox."""
+        if keyring is None:
+            return
+        try:
+            if self.chk_remember_key.isChecked():
+                if keyring.get_password(KEYRING_SERVICE, KEYRING_USERNAME) != api_key:
+                    keyring.set_password(KEYRING_SERVICE, KEYRING_USERNAME, api_key)
+            elif keyring.get_password(KEYRING_SERVICE, KEYRING_USERNAME) is not None:
+                keyring.delete_password(KEYRING_SERVICE, KEYRING_USERNAME)
+        except keyring.errors.KeyringError as e:
+            # Not being able to remember the key shouldn't block the run
+            print(f"Could not update the keyring: {e}")
+
+    def _validate_inputs(self):
+        """
+        Cheap local checks on every input, reported together, so a typo in
+        any path is caught before it costs an LLM call.
+        """
+        errors = []
+        if not self.entry_api_key.text().strip():
+            errors.append("Please provide an OpenAI API Key.")
+
+        doc_path = self.entry_doc.text().strip()
+        if not doc_path:
+            errors.append("Please select an input document.")
+
+        checks = [
+            ("Input document", doc_path, DOCUMENT_EXTENSIONS),
+            ("Rubric", self.entry_rubric.text().strip(), SIDE_DOCUMENT_EXTENSIONS),
+            ("Assignment KB", self.entry_assign_kb.text().strip(), SIDE_DOCUMENT_EXTENSIONS),
+            ("General KB", self.entry_general_kb.text().strip(), SIDE_DOCUMENT_EXTENSIONS),
+        ]
+        for label, path, extensions in checks:
+            if not path:
+                continue
+            try:
+                st = os.stat(path)  # existence and size in one call
+            except OSError:
+                errors.append(f"{label} not found: {path}")
+                continue
+            if os.path.splitext(path)[1].lower() not in extensions:
+                errors.append(f"{label} must be one of {', '.join(sorted(extensions))}: {path}")
+            elif st.st_size == 0:
+                errors.append(f"{label} is empty: {path}")
+            elif not os.access(path, os.R_OK):
+                errors.append(f"{label} is not readable: {path}")
+        return errors
 
     def run_commenter(self):
+        # Message boxes and the keyring can spin a nested event loop, and a
+        # run in flight owns self._thread: ignore a second click in either case
+        if self._busy or self._thread is not None:
+            return
+        self._busy = True
+        try:
+            self._start_run()
+        finally:
+            self._busy = False
+
+    def _start_run(self):
         doc_path = self.entry_doc.text().strip()
         api_key = self.entry_api_key.text().strip()
         rubric_path = self.entry_rubric.text().strip()
         assign_kb_path = self.entry_assign_kb.text().strip()
         general_kb_path = self.entry_general_kb.text().strip()
 
-        if not api_key:
-            QMessageBox.critical(self, "Error", "Please provide an OpenAI API Key.")
+        errors = self._validate_inputs()
+        if errors:
+            QMessageBox.critical(self, "Error", "\n".join(errors))
             return
 
-        if not doc_path:
-            QMessageBox.critical(self, "Error", "Please select an input document.")
-            return
-        if not os.path.exists(doc_path):
-            QMessageBox.critical(self, "Error", f"Input document not found: {doc_path}")
-            return
+        self._job = Job.for_document(doc_path)
+        self._remember_api_key(api_key)
+        # The user may click Run before the deferred import has happened
+        if not self._annotators:
+            self._warm_imports()
+
+        # The LLM call and annotation run on a worker thread so the window
+        # stays responsive; results come back through signals.
+        self.btn_run.setEnabled(False)
+        self._thread = QThread(self)
+        self._worker = CommenterWorker(self._job, rubric_path, assign_kb_path, general_kb_path,
+                                       load_comment_module().get_openai_client(api_key), self.chk_use_cache.isChecked(),
+                                       self._annotators)
+        self._worker.moveToThread(self._thread)
+
+        self._thread.started.connect(self._worker.run)
+        self._worker.status.connect(self.lbl_status.setText)
+        self._worker.progress.connect(self.on_commenter_progress)
+        self._worker.done.connect(self.on_commenter_done)
+        self._worker.error.connect(self.on_commenter_error)
+        self._worker.done.connect(self._thread.quit)
+        self._worker.error.connect(self._thread.quit)
+        self._thread.finished.connect(self.on_thread_finished)
+
+        self._thread.start()
+
+    def on_commenter_progress(self, value, maximum):
+        # maximum 0 shows a busy indicator while the total is still unknown
+        self.progress_bar.setRange(0, maximum)
+        self.progress_bar.setValue(value)
 
+    def on_commenter_done(self, out_path):
+        self.lbl_status.setText(f"Success! Saved to: {self._job.out_name}")
+        QMessageBox.information(self, "Success", f"Wrote annotated file to:\n{out_path}")
+
+    def on_commenter_error(self, message):
+        self.lbl_status.setText("Error occurred")
+        self.progress_bar.setRange(0, 1)
+        self.progress_bar.setValue(0)
+        QMessageBox.critical(self, "Error", message)
+
+    def on_thread_finished(self):
+        self._worker.deleteLater()
+        self._thread.deleteLater()
+        self._worker = None
+        self._thread = None
+        self.btn_run.setEnabled(True)
+
+    def closeEvent(self, event):
+        # Don't destroy a QThread that is still running
+        if self._thread is not None:
+            self._thread.quit()
+            self._thread.wait()
+        self.settings.setValue("geometry", self.saveGeometry())
+        super().closeEvent(event)
+
+
+class CommenterWorker(QObject):
+    """Runs the LLM + annotation pipeline on a worker thread."""
+
+    status = pyqtSignal(str)
+    progress = pyqtSignal(int, int)  # (applied, total); total 0 while still streaming
+    done = pyqtSignal(str)
+    error = pyqtSignal(str)
+
+    def __init__(self, job, rubric_path, assign_kb_path, general_kb_path, client, use_cache, annotators):
+        super().__init__()
+        self.job = job
+        self.rubric_path = rubric_path
+        self.assign_kb_path = assign_kb_path
+        self.general_kb_path = general_kb_path
+        self.client = client
+        self.use_cache = use_cache
+        self.annotators = annotators
+
+    def run(self):
         try:
-            self.lbl_status.setText("Processing with LLM...")
-            QApplication.processEvents()
+            self.status.emit("Processing with LLM...")
+            self.progress.emit(0, 0)
 
-            # Set API key
-            os.environ["OPENAI_API_KEY"] = api_key
-            
-            # Generate annotations via LLM
-            annotations = comment.generate_annotations(
-                doc_path, 
-                rubric_path, 
-                assign_kb_path, 
-                general_kb_path
-            )
-            
-            self.lbl_status.setText("Annotating document...")
-            QApplication.processEvents()
-            
-            base, ext = os.path.splitext(doc_path)
-            out_path = f"{base}-annotated{ext}"
-            
-            ext_lower = ext.lower()
-            if ext_lower == ".docx":
-                comment.annotate_docx(doc_path, out_path, annotations)
-            elif ext_lower == ".pdf":
-                comment.annotate_pdf(doc_path, out_path, annotations)
-            else:
+            job = self.job
+            # Checked before the LLM call so an unsupported input costs nothing
+            annotators = self.annotators.get(job.ext)
+            if annotators is None:
                 raise ValueError("Unsupported file extension. Only .docx and .pdf are supported.")
+
+            # A DOCX is parsed once and shared between prompt text and annotation
+            document = None
+            doc_text = None
+            if job.ext == ".docx":
+                comment = load_comment_module()
+                document = comment.Document(job.doc_path)
+                doc_text = comment.extract_text_from_docx_obj(document)
+
+            # Read once here; the same bytes feed both the cache key and the prompt
+            side_data = load_side_documents(self.rubric_path, self.assign_kb_path, self.general_kb_path)
+
+            # Annotations already generated for identical inputs are reused.
+            # With use_cache off the lookup is skipped, but the fresh result
+            # is still stored.
+            key = annotations_cache_key(
+                job.doc_path, self.rubric_path, self.assign_kb_path, self.general_kb_path, side_data
+            )
+            cached = load_cached_annotations(key) if self.use_cache else None
+
+            # Save beside the target and rename into place, so a failure
+            # mid-write never leaves a truncated file under the real name
+            source = document if document is not None else job.doc_path
+            tmp_out = job.out_path + ".part"
+            annotate_batch, annotate_stream = annotators
+            try:
+                if cached is not None:
+                    # Nothing to overlap with: apply the whole set in one pass
+                    self.status.emit(f"Annotating {job.out_name}... (cached)")
+                    annotate_batch(source, tmp_out, cached)
+                    applied = len(cached)
+                else:
+                    # Fresh annotations arrive one at a time and each is
+                    # applied while the model writes the next
+                    annotations = generate_and_cache_annotations_stream(
+                        key,
+                        job.doc_path, 
+                        self.rubric_path, 
+                        self.assign_kb_path, 
+                        self.general_kb_path,
+                        doc_text=doc_text,
+                        side_data=side_data,
+                        client=self.client
+                    )
+                    applied = annotate_stream(source, tmp_out, annotations, self.on_applied)
+                os.replace(tmp_out, job.out_path)
+            except BaseException:
+                if os.path.exists(tmp_out):
+                    os.remove(tmp_out)
+                raise
             
-            self.lbl_status.setText(f"Success! Saved to: {os.path.basename(out_path)}")
-            QMessageBox.information(self, "Success", f"Wrote annotated file to:\n{out_path}")
+            self.progress.emit(applied, max(applied, 1))
+            self.done.emit(job.out_path)
             
         except Exception as e:
-            self.lbl_status.setText("Error occurred")
-            QMessageBox.critical(self, "Error", str(e))
+            self.error.emit(str(e))
+
+    def on_applied(self, applied):
+        self.status.emit(f"Annotating {self.job.out_name}... ({applied} applied)")
+        self.progress.emit(applied, 0)
 
 if __name__ == "__main__":
     app = QApplication(sys.argv)
@@ -0,0 +1,92 @@
+"""
+Regex targets must match exactly as Python's re would, whichever optional
+engines (google-re2, Hyperscan) are installed. Each row is checked against
+a plain re.search of the same pattern.
+"""
+import re
+
+import pytest
+from docx import Document
+
+import comment
+
+# (pattern, paragraph text, case_sensitive, whole_word)
+CASES = [
+    # ASCII patterns RE2 may run
+    (r"foo", "a foo b", True, True),
+    (r"fo+", "xfoo", True, False),
+    (r"\d+", "abc 123", False, True),
+    (r"\w+ing", "testing this", False, True),
+    (r"a{2}", "caab", True, False),
+    (r"a{1,}b", "aab", True, False),
+    (r"(?i)K", "k", True, False),
+    (r"a.b", "a\nb", True, False),
+    (r"(?m)^b", "a\nb", True, False),
+    (r"[^a]", "aab", True, False),
+    (r"(\w+\s?)*$", "one two three", True, False),
+    (r"^a\S*\s+b$", "A-1 \t B", False, False),
+    # Patterns without \b/\w/\d/\s or case folding keep RE2 on non-ASCII text
+    (r"(a+)+b", "“aab”", True, False),
+    (r"caf.$", "“café", True, False),
+    (r"caf[^e]", "café", True, False),
+    (r"–.+–", "a – b – c", True, False),
+    (r"é$", "café\n", True, False),
+    (r"(?i)CAF", "“café”", True, False),
+    (r"(?s:.)İ", "aİ", True, False),
+    # Same patterns on non-ASCII text, where RE2's \b/\w/\d and case folding differ
+    (r"İstanbul", "İstanbul istanbul", False, True),
+    (r"istanbul", "İstanbul is big", False, False),
+    (r"caf.", "CAFÉ au lait", False, True),
+    (r"\w+", "éé", True, True),
+    (r"k", "K", False, False),
+    # Constructs re reads differently even on ASCII text
+    (r"ab{,3}c", "ac", True, False),
+    (r"a{,}b", "b", True, False),
+    (r"a\sb", "a\x0bb", True, False),
+    (r"a\sb", "a\x1cb", True, False),
+    (r"\S+", "\x1c", True, False),
+    (r"a$", "a\n", True, False),
+    (r"[[:alpha:]]+", "a:", True, False),
+    # re-only syntax RE2 can't compile
+    (r"(a)\1", "aa", True, False),
+    (r"(?<=a)b", "ab", True, False),
+]
+
+
+def _re_reference(pattern, text, case_sensitive, whole_word):
+    if whole_word:
+        pattern = r"\b" + pattern + r"\b"
+    return re.search(pattern, text, 0 if case_sensitive else re.IGNORECASE) is not None
+
+
+@pytest.mark.parametrize("pattern, text, case_sensitive, whole_word", CASES)
+def test_compile_matcher_follows_re(pattern, text, case_sensitive, whole_word):
+    matcher = comment.compile_matcher(pattern, "regex", case_sensitive, whole_word)
+    expected = _re_reference(pattern, text, case_sensitive, whole_word)
+    assert (matcher.search(text) is not None) == expected
+    assert comment.match_text_in_paragraph(text, pattern, "regex", case_sensitive, whole_word) == expected
+
+
+@pytest.mark.parametrize("pattern, text, case_sensitive, whole_word", CASES)
+def test_comment_docx_follows_re(pattern, text, case_sensitive, whole_word):
+    # Goes through the Hyperscan prefilter when it is installed; the database
+    # is only built for two or more regex targets, hence the filler
+    if any(ord(c) < 0x20 and c not in "\t\n" for c in text):
+        pytest.skip("control characters can't be stored in a .docx paragraph")
+    doc = Document()
+    doc.add_paragraph(text)
+    annotation = {
+        "target": {
+            "text": pattern,
+            "match_type": "regex",
+            "case_sensitive": case_sensitive,
+            "whole_word": whole_word,
+        },
+        "comment": {"text": "note"},
+    }
+    filler = {
+        "target": {"text": "zzz-never", "match_type": "regex", "case_sensitive": True},
+        "comment": {"text": "filler"},
+    }
+    comment.comment_docx(doc, [annotation, filler])
+    assert len(doc.comments) == _re_reference(pattern, text, case_sensitive, whole_word)
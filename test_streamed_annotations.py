@@ -0,0 +1,67 @@
+"""
+iter_streamed_annotations must yield what a plain parse of the whole reply
+would, however the reply is split into chunks, and must fail on a reply
+that was cut off rather than return part of it.
+"""
+import random
+from types import SimpleNamespace
+
+import orjson
+import pytest
+
+import comment
+
+ANNOTATIONS = [
+    {"target": {"text": "the {first} one"}, "comment": {"text": "Say \"why\" [here]"}},
+    {"target": {"text": "second\\", "occurrence": "all"}, "comment": {"text": "}]"}},
+    {"target": {"text": "third", "match_type": "regex"}, "comment": {"text": "ok"}},
+]
+
+PAYLOADS = [
+    orjson.dumps(ANNOTATIONS).decode(),
+    orjson.dumps({"annotations": ANNOTATIONS}).decode(),
+    orjson.dumps({"note": "x", "annotations": ANNOTATIONS}, option=orjson.OPT_INDENT_2).decode(),
+]
+
+
+def _random_chunks(text, seed):
+    rng = random.Random(seed)
+    chunks, i = [], 0
+    while i < len(text):
+        n = rng.randint(1, 12)
+        chunks.append(text[i:i + n])
+        i += n
+    return chunks
+
+
+@pytest.mark.parametrize("seed", range(20))
+@pytest.mark.parametrize("payload", PAYLOADS)
+def test_complete_reply_in_random_chunks(payload, seed):
+    assert list(comment.iter_streamed_annotations(_random_chunks(payload, seed))) == ANNOTATIONS
+
+
+def test_bare_annotation():
+    payload = orjson.dumps(ANNOTATIONS[0]).decode()
+    assert list(comment.iter_streamed_annotations(_random_chunks(payload, 0))) == [ANNOTATIONS[0]]
+
+
+@pytest.mark.parametrize("seed", range(20))
+@pytest.mark.parametrize("payload", PAYLOADS)
+def test_truncated_reply_in_random_chunks(payload, seed):
+    # Cut anywhere before the final closing bracket, as a token limit would
+    cut = random.Random(seed).randrange(1, len(payload.rstrip()) - 1)
+    with pytest.raises(ValueError):
+        list(comment.iter_streamed_annotations(_random_chunks(payload[:cut], seed)))
+
+
+def _chunk(content, finish_reason=None):
+    delta = SimpleNamespace(content=content)
+    return SimpleNamespace(choices=[SimpleNamespace(delta=delta, finish_reason=finish_reason)])
+
+
+def test_length_finish_reason_fails():
+    # A reply cut at the token limit can still happen to be valid JSON
+    payload = orjson.dumps(ANNOTATIONS[:1]).decode()
+    stream = [_chunk(payload[:5]), _chunk(payload[5:], "length")]
+    with pytest.raises(ValueError):
+        list(comment.iter_streamed_annotations(comment._completion_text_chunks(stream)))